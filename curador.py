@@ -1,6 +1,9 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 
 print("="*60)
 print("CURADOR DE CANALES - Version sin emojis")
@@ -11,83 +14,121 @@ LISTA_PRINCIPAL = "lista_combo.m3u"
 FUENTES = "fuentes.txt"
 SALIDA = "lista_combo_nueva.m3u"
 
-# 1. Leer lista principal
+# Red
+TIMEOUT = 5
+HILOS = 32
+
+# Sesion compartida: reutiliza conexiones TCP/TLS entre peticiones al mismo servidor
+SESION = requests.Session()
+_adaptador = HTTPAdapter(pool_connections=HILOS, pool_maxsize=HILOS,
+                         max_retries=Retry(total=2, read=0, backoff_factor=0.3))
+SESION.mount("http://", _adaptador)
+SESION.mount("https://", _adaptador)
+
+# 1. Leer lista principal y extraer nombres (linea a linea, sin cargar el archivo entero)
+nombres_originales = []
 try:
     with open(LISTA_PRINCIPAL, 'r', encoding='utf-8') as f:
-        lineas = f.readlines()
+        for linea in f:
+            if linea.startswith("#EXTINF:"):
+                nombre = linea.strip().rpartition(",")[2]
+                nombres_originales.append(nombre)
 except:
     print("ERROR: No se encuentra lista_combo.m3u")
     exit()
 
-# Extraer nombres
-nombres_originales = []
-for linea in lineas:
-    if linea.startswith("#EXTINF:"):
-        nombre = linea.strip().split(",")[-1]
-        nombres_originales.append(nombre)
-
 print(f"\nCanales que quieres: {len(nombres_originales)}")
 
 # 2. Leer fuentes
 try:
     with open(FUENTES, 'r', encoding='utf-8') as f:
-        urls = [linea.strip() for linea in f if linea.strip()]
+        # Solo lineas con URL http(s); vacias y comentarios se ignoran
+        urls = [url for url in (linea.strip() for linea in f)
+                if url.startswith(("http://", "https://"))]
     print(f"Fuentes: {len(urls)}")
 except:
     print("ERROR: No se encuentra fuentes.txt")
     exit()
 
-# 3. Función para limpiar nombres
+# 3. Descargar cada fuente una sola vez, en paralelo
+def descargar_fuente(url):
+    try:
+        r = SESION.get(url, timeout=TIMEOUT)
+        if r.status_code != 200:
+            return None
+        lineas_fuente = r.text.splitlines()
+    except:
+        return None
+    # Emparejar cada #EXTINF con la linea siguiente (la URL del canal) y
+    # guardar ya su version en minusculas para no repetirla en cada busqueda
+    entradas = []
+    for i, linea in enumerate(lineas_fuente):
+        if linea.startswith("#EXTINF:"):
+            siguiente = lineas_fuente[i+1] if i+1 < len(lineas_fuente) else None
+            entradas.append((linea.lower(), linea, siguiente))
+    return entradas
+
+print("\nDescargando fuentes...")
+with ThreadPoolExecutor(max_workers=HILOS) as ex:
+    descargas = list(ex.map(descargar_fuente, urls))
+fuentes = [(url, entradas) for url, entradas in zip(urls, descargas)
+           if entradas is not None]
+print(f"Fuentes descargadas: {len(fuentes)}")
+
+# 4. Función para limpiar nombres
+ETIQUETAS_RE = re.compile(r'\bes:?\s*|\bhd\b|\bfhd\b|\bsd\b|\b1080p\b|\b720p\b|\([^)]*\)')
+
 def limpiar_nombre(nombre):
     nombre = nombre.lower()
-    nombre = re.sub(r'\bes:?\s*|\bhd\b|\bfhd\b|\bsd\b|\b1080p\b|\b720p\b|\([^)]*\)', '', nombre)
-    nombre = re.sub(r'\s+', ' ', nombre).strip()
+    nombre = ETIQUETAS_RE.sub('', nombre)
+    nombre = " ".join(nombre.split())
     return nombre
 
-# 4. Buscar coincidencias
+# 5. Buscar coincidencias
+def buscar_canal(nombre_limpio):
+    for url, entradas in fuentes:
+        for linea_min, linea, siguiente in entradas:
+            if nombre_limpio in linea_min:
+                return url, linea, siguiente
+    return None
+
 print("\nBuscando coincidencias...")
 encontrados = 0
 no_encontrados = []
+# Nombres que quedan iguales tras limpiarlos se buscan una sola vez
+coincidencias = {}
 
-with open(SALIDA, 'w', encoding='utf-8') as out:
-    out.write("#EXTM3U\n")
+# Las lineas de la nueva lista se acumulan y se escriben de una vez al final
+salida = ["#EXTM3U"]
+for idx, nombre in enumerate(nombres_originales, 1):
+    nombre_limpio = limpiar_nombre(nombre)
+    if nombre_limpio not in coincidencias:
+        coincidencias[nombre_limpio] = buscar_canal(nombre_limpio)
+    coincidencia = coincidencias[nombre_limpio]
+    
+    if coincidencia:
+        url, linea, siguiente = coincidencia
+        salida.append(linea)
+        if siguiente is not None:
+            salida.append(siguiente)
+        encontrados += 1
+        resultado = f"ENCONTRADO en: {url}"
+    else:
+        no_encontrados.append(nombre)
+        resultado = "NO ENCONTRADO"
     
-    for idx, nombre in enumerate(nombres_originales, 1):
-        nombre_limpio = limpiar_nombre(nombre)
-        print(f"\n  [{idx}/{len(nombres_originales)}] {nombre[:40]}")
-        print(f"     Buscando: '{nombre_limpio}'")
-        
-        hallado = False
-        for url in urls:
-            try:
-                r = requests.get(url, timeout=5)
-                if r.status_code != 200:
-                    continue
-                lineas_fuente = r.text.splitlines()
-                
-                for i, linea in enumerate(lineas_fuente):
-                    if linea.startswith("#EXTINF:"):
-                        if nombre_limpio in linea.lower():
-                            out.write(linea + "\n")
-                            if i+1 < len(lineas_fuente):
-                                out.write(lineas_fuente[i+1] + "\n")
-                            hallado = True
-                            encontrados += 1
-                            print(f"     ENCONTRADO en: {url}")
-                            break
-                if hallado:
-                    break
-            except:
-                continue
-        
-        if not hallado:
-            no_encontrados.append(nombre)
-            print(f"     NO ENCONTRADO")
-
-# 5. Reemplazar lista antigua
+    # Un solo print por canal: una escritura en consola en vez de tres
+    print(f"\n  [{idx}/{len(nombres_originales)}] {nombre[:40]}\n"
+          f"     Buscando: '{nombre_limpio}'\n"
+          f"     {resultado}")
+
+with open(SALIDA, 'w', encoding='utf-8') as out:
+    out.write("\n".join(salida) + "\n")
+
+# 6. Reemplazar lista antigua
 os.replace(SALIDA, LISTA_PRINCIPAL)
 
-# 6. Resumen
+# 7. Resumen
 print("\n" + "="*60)
 print("RESUMEN")
 print("="*60)